@@ -5,9 +5,10 @@ A super simple FastAPI application that allows students to view and sign up
 for extracurricular activities at Mergington High School.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
+import orjson
 import os
 from pathlib import Path
 
@@ -19,68 +20,84 @@ current_dir = Path(__file__).parent
 app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
           "static")), name="static")
 
-# In-memory activity database
+# In-memory activity database. Participants are stored as sets so membership
+# checks and removals stay O(1); they are serialized as sorted lists at
+# response time.
 activities = {
     "Chess Club": {
         "description": "Learn strategies and compete in chess tournaments",
         "schedule": "Fridays, 3:30 PM - 5:00 PM",
         "max_participants": 12,
-        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
+        "participants": {"michael@mergington.edu", "daniel@mergington.edu"}
     },
     "Programming Class": {
         "description": "Learn programming fundamentals and build software projects",
         "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
         "max_participants": 20,
-        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
+        "participants": {"emma@mergington.edu", "sophia@mergington.edu"}
     },
     "Gym Class": {
         "description": "Physical education and sports activities",
         "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
         "max_participants": 30,
-        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
+        "participants": {"john@mergington.edu", "olivia@mergington.edu"}
     },
     # Sports related activities
     "Soccer Team": {
         "description": "Join the school soccer team and compete in matches",
         "schedule": "Wednesdays, 4:00 PM - 5:30 PM",
         "max_participants": 22,
-        "participants": ["lucas@mergington.edu", "mia@mergington.edu"]
+        "participants": {"lucas@mergington.edu", "mia@mergington.edu"}
     },
     "Basketball Club": {
         "description": "Practice basketball skills and play friendly games",
         "schedule": "Thursdays, 3:30 PM - 5:00 PM",
         "max_participants": 15,
-        "participants": ["liam@mergington.edu", "ava@mergington.edu"]
+        "participants": {"liam@mergington.edu", "ava@mergington.edu"}
     },
     # Artistic activities
     "Art Workshop": {
         "description": "Explore painting, drawing, and sculpture techniques",
         "schedule": "Mondays, 4:00 PM - 5:30 PM",
         "max_participants": 18,
-        "participants": ["noah@mergington.edu", "isabella@mergington.edu"]
+        "participants": {"noah@mergington.edu", "isabella@mergington.edu"}
     },
     "Drama Club": {
         "description": "Act, direct, and produce school plays and performances",
         "schedule": "Tuesdays, 3:30 PM - 5:00 PM",
         "max_participants": 20,
-        "participants": ["ethan@mergington.edu", "charlotte@mergington.edu"]
+        "participants": {"ethan@mergington.edu", "charlotte@mergington.edu"}
     },
     # Intellectual activities
     "Math Olympiad": {
         "description": "Prepare for math competitions and solve challenging problems",
         "schedule": "Fridays, 4:00 PM - 5:30 PM",
         "max_participants": 16,
-        "participants": ["alex@mergington.edu", "grace@mergington.edu"]
+        "participants": {"alex@mergington.edu", "grace@mergington.edu"}
     },
     "Science Club": {
         "description": "Conduct experiments and explore scientific concepts",
         "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
         "max_participants": 20,
-        "participants": ["ben@mergington.edu", "zoe@mergington.edu"]
+        "participants": {"ben@mergington.edu", "zoe@mergington.edu"}
     }
 }
 
 
+# Cached JSON body for GET /activities; rebuilt lazily after any mutation
+_activities_json = None
+
+
+def invalidate_activities_cache():
+    """Drop the cached /activities response body.
+
+    Called by the mutating endpoints; callers that modify ``activities``
+    directly (e.g. tests) must call this themselves.
+    """
+    global _activities_json
+    _activities_json = None
+
+
 @app.get("/")
 def root():
     return RedirectResponse(url="/static/index.html")
@@ -88,7 +105,14 @@ def root():
 
 @app.get("/activities")
 def get_activities():
-    return activities
+    global _activities_json
+    if _activities_json is None:
+        payload = {
+            name: {**activity, "participants": sorted(activity["participants"])}
+            for name, activity in activities.items()
+        }
+        _activities_json = orjson.dumps(payload)
+    return Response(content=_activities_json, media_type="application/json")
 
 
 @app.post("/activities/{activity_name}/signup")
@@ -110,7 +134,8 @@ def signup_for_activity(activity_name: str, email: str):
         raise HTTPException(status_code=400, detail="Activity is full")
 
     # Add student
-    activity["participants"].append(email)
+    activity["participants"].add(email)
+    invalidate_activities_cache()
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
@@ -130,4 +155,5 @@ def unregister_from_activity(activity_name: str, email: str):
 
     # Remove student
     activity["participants"].remove(email)
+    invalidate_activities_cache()
     return {"message": f"Unregistered {email} from {activity_name}"}
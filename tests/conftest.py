@@ -2,87 +2,109 @@
 Pytest configuration and fixtures for the High School Management System API tests.
 """
 
+import copy
+
+import httpx
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
-from src.app import app, activities
+from src.app import app, activities, invalidate_activities_cache
 
 
-@pytest.fixture
+# The activity names shipped in the default data set
+EXPECTED_ACTIVITIES = frozenset({
+    "Chess Club", "Programming Class", "Gym Class", "Soccer Team",
+    "Basketball Club", "Art Workshop", "Drama Club", "Math Olympiad",
+    "Science Club",
+})
+
+
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+    """Create a single test client shared across the whole test session.
+
+    Building ``TestClient(app)`` spins up the ASGI lifespan machinery, so we
+    do it once per session instead of once per test. State isolation between
+    tests is handled by the function-scoped ``reset_activities`` fixture.
+    """
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def asgi_transport():
+    """Provide one in-memory ASGI transport shared by every async client."""
+    return httpx.ASGITransport(app=app)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def aclient(asgi_transport):
+    """Create a session-wide async client on the shared ASGI transport.
+
+    Unlike ``TestClient``, this stays on one event loop with no sync/async
+    thread bridge, so each request is a plain in-process ASGI call.
+    """
+    async with httpx.AsyncClient(transport=asgi_transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def _activities_snapshot():
+    """Capture the pristine activities data once for the whole session."""
+    return copy.deepcopy(activities)
+
+
+@pytest.fixture(autouse=True)
+def reset_activities(_activities_snapshot):
+    """Reset activities to their initial state before and after each test."""
+
+    def restore():
+        # Drop any activities a test added (e.g. "Test Club").
+        for name in list(activities):
+            if name not in _activities_snapshot:
+                del activities[name]
+        # Rebind only the participants sets that actually diverged; tests
+        # never touch the description/schedule/capacity fields, so those
+        # entries can be left alone.
+        for name, data in _activities_snapshot.items():
+            entry = activities.get(name)
+            if entry is None:
+                activities[name] = {**data, "participants": set(data["participants"])}
+            elif entry["participants"] != data["participants"]:
+                entry["participants"] = set(data["participants"])
+        invalidate_activities_cache()
+
+    restore()
+    yield
+    restore()
 
 
 @pytest.fixture
-def reset_activities():
-    """Reset activities to initial state before each test."""
-    # Store original activities
-    original_activities = {
-        "Chess Club": {
-            "description": "Learn strategies and compete in chess tournaments",
-            "schedule": "Fridays, 3:30 PM - 5:00 PM",
-            "max_participants": 12,
-            "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-        },
-        "Programming Class": {
-            "description": "Learn programming fundamentals and build software projects",
-            "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 20,
-            "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-        },
-        "Gym Class": {
-            "description": "Physical education and sports activities",
-            "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-            "max_participants": 30,
-            "participants": ["john@mergington.edu", "olivia@mergington.edu"]
-        },
-        "Soccer Team": {
-            "description": "Join the school soccer team and compete in matches",
-            "schedule": "Wednesdays, 4:00 PM - 5:30 PM",
-            "max_participants": 22,
-            "participants": ["lucas@mergington.edu", "mia@mergington.edu"]
-        },
-        "Basketball Club": {
-            "description": "Practice basketball skills and play friendly games",
-            "schedule": "Thursdays, 3:30 PM - 5:00 PM",
-            "max_participants": 15,
-            "participants": ["liam@mergington.edu", "ava@mergington.edu"]
-        },
-        "Art Workshop": {
-            "description": "Explore painting, drawing, and sculpture techniques",
-            "schedule": "Mondays, 4:00 PM - 5:30 PM",
-            "max_participants": 18,
-            "participants": ["noah@mergington.edu", "isabella@mergington.edu"]
-        },
-        "Drama Club": {
-            "description": "Act, direct, and produce school plays and performances",
-            "schedule": "Tuesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 20,
-            "participants": ["ethan@mergington.edu", "charlotte@mergington.edu"]
-        },
-        "Math Olympiad": {
-            "description": "Prepare for math competitions and solve challenging problems",
-            "schedule": "Fridays, 4:00 PM - 5:30 PM",
-            "max_participants": 16,
-            "participants": ["alex@mergington.edu", "grace@mergington.edu"]
-        },
-        "Science Club": {
-            "description": "Conduct experiments and explore scientific concepts",
-            "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 20,
-            "participants": ["ben@mergington.edu", "zoe@mergington.edu"]
+def make_activity():
+    """Create temporary activities and guarantee their removal after the test.
+
+    Returns a factory: ``make_activity(name, max_participants, participants)``.
+    Cleanup happens in fixture teardown, so added keys are removed even when
+    the test body raises part-way through.
+    """
+    created = []
+
+    def _make(name, max_participants, participants=()):
+        activities[name] = {
+            "description": f"Temporary test activity: {name}",
+            "schedule": "Test schedule",
+            "max_participants": max_participants,
+            "participants": set(participants),
         }
-    }
-    
-    # Reset activities before test
-    activities.clear()
-    activities.update(original_activities)
-    
-    yield
-    
-    # Reset activities after test (cleanup)
-    activities.clear()
-    activities.update(original_activities)
+        invalidate_activities_cache()
+        created.append(name)
+        return activities[name]
+
+    yield _make
+
+    for name in created:
+        activities.pop(name, None)
+    invalidate_activities_cache()
 
 
 @pytest.fixture
@@ -92,5 +114,5 @@ def sample_activity():
         "description": "Test activity description",
         "schedule": "Mondays, 3:00 PM - 4:00 PM",
         "max_participants": 5,
-        "participants": ["test1@mergington.edu", "test2@mergington.edu"]
+        "participants": {"test1@mergington.edu", "test2@mergington.edu"}
     }
\ No newline at end of file
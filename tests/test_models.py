@@ -2,58 +2,59 @@
 Test cases for data models and business logic validation.
 """
 
+from typing import Annotated
+
 import pytest
+from pydantic import BaseModel, PositiveInt, StringConstraints, TypeAdapter
 from src.app import activities
+from tests.conftest import EXPECTED_ACTIVITIES
+
+
+# Matches the basic "looks like an email" check the tests have always used
+Email = Annotated[str, StringConstraints(pattern=r".+@.+")]
+
+
+class ActivityModel(BaseModel):
+    """Schema of one entry in the in-memory activities table."""
+    description: str
+    schedule: str
+    max_participants: PositiveInt
+    participants: set[Email]
+
+
+ACTIVITIES_ADAPTER = TypeAdapter(dict[str, ActivityModel])
 
 
 class TestDataModels:
     """Test cases for data model structure and validation."""
     
-    def test_activity_structure(self, reset_activities):
+    def test_activity_structure(self):
         """Test that all activities have the required structure."""
-        required_fields = ["description", "schedule", "max_participants", "participants"]
-        
-        for activity_name, activity_data in activities.items():
-            assert isinstance(activity_name, str), f"Activity name should be string: {activity_name}"
-            assert isinstance(activity_data, dict), f"Activity data should be dict: {activity_name}"
-            
-            for field in required_fields:
-                assert field in activity_data, f"Missing field '{field}' in activity '{activity_name}'"
-            
-            # Test field types
-            assert isinstance(activity_data["description"], str)
-            assert isinstance(activity_data["schedule"], str)
-            assert isinstance(activity_data["max_participants"], int)
-            assert isinstance(activity_data["participants"], list)
-            assert activity_data["max_participants"] > 0
-            
-            # Test participants are strings (emails)
-            for participant in activity_data["participants"]:
-                assert isinstance(participant, str)
-                assert "@" in participant  # Basic email validation
+        # One Rust-backed validation pass replaces the per-field isinstance
+        # checks; a schema violation raises with the offending location.
+        ACTIVITIES_ADAPTER.validate_python(activities, strict=True)
     
-    def test_activity_capacity_constraints(self, reset_activities):
+    def test_activity_capacity_constraints(self):
         """Test that no activity exceeds its capacity."""
-        for activity_name, activity_data in activities.items():
-            current_participants = len(activity_data["participants"])
-            max_participants = activity_data["max_participants"]
-            
-            assert current_participants <= max_participants, (
-                f"Activity '{activity_name}' has {current_participants} participants "
-                f"but max is {max_participants}"
-            )
+        over_capacity = {
+            name: (len(data["participants"]), data["max_participants"])
+            for name, data in activities.items()
+            if len(data["participants"]) > data["max_participants"]
+        }
+        assert not over_capacity, f"Activities over capacity: {over_capacity}"
     
-    def test_participant_email_uniqueness_within_activity(self, reset_activities):
-        """Test that each activity has unique participant emails."""
-        for activity_name, activity_data in activities.items():
-            participants = activity_data["participants"]
-            unique_participants = set(participants)
-            
-            assert len(participants) == len(unique_participants), (
-                f"Activity '{activity_name}' has duplicate participants"
-            )
+    def test_participant_email_uniqueness_within_activity(self, client):
+        """Test that the serialized participant lists contain no duplicates."""
+        # Storage is a set, so duplicates can only appear in the JSON view;
+        # check the actual serialized response, not the raw dict.
+        data = client.get("/activities").json()
+        with_duplicates = {
+            name for name, activity in data.items()
+            if len(activity["participants"]) != len(set(activity["participants"]))
+        }
+        assert not with_duplicates, f"Activities with duplicates: {with_duplicates}"
     
-    def test_activity_names_are_unique(self, reset_activities):
+    def test_activity_names_are_unique(self):
         """Test that activity names are unique (should be guaranteed by dict structure)."""
         activity_names = list(activities.keys())
         unique_names = set(activity_names)
@@ -64,46 +65,37 @@ class TestDataModels:
 class TestBusinessLogic:
     """Test business logic and constraints."""
     
-    def test_spots_available_calculation(self, reset_activities):
+    def test_spots_available_calculation(self):
         """Test calculation of available spots."""
-        for activity_name, activity_data in activities.items():
-            spots_left = activity_data["max_participants"] - len(activity_data["participants"])
-            
-            # Spots left should never be negative
-            assert spots_left >= 0, f"Activity '{activity_name}' has negative spots available"
+        # Spots left should never be negative
+        negative_spots = {
+            name: data["max_participants"] - len(data["participants"])
+            for name, data in activities.items()
+            if data["max_participants"] - len(data["participants"]) < 0
+        }
+        assert not negative_spots, f"Activities with negative spots: {negative_spots}"
     
-    def test_initial_activity_state(self, reset_activities):
+    def test_initial_activity_state(self):
         """Test the initial state of activities is valid."""
-        # Test we have expected number of activities
-        assert len(activities) == 9
-        
-        # Test specific activities exist
-        expected_activities = [
-            "Chess Club", "Programming Class", "Gym Class", "Soccer Team",
-            "Basketball Club", "Art Workshop", "Drama Club", "Math Olympiad", "Science Club"
-        ]
-        
-        for expected_activity in expected_activities:
-            assert expected_activity in activities
+        # Set equality covers both the count and the exact membership
+        assert set(activities) == EXPECTED_ACTIVITIES
     
-    def test_participant_email_format_basic(self, reset_activities):
+    def test_participant_email_format_basic(self):
         """Test basic email format validation for existing participants."""
-        for activity_name, activity_data in activities.items():
-            for participant in activity_data["participants"]:
-                # Basic checks
-                assert "@" in participant, f"Invalid email format: {participant}"
-                assert participant.endswith("@mergington.edu"), (
-                    f"Email should end with @mergington.edu: {participant}"
-                )
-                assert len(participant) > len("@mergington.edu"), (
-                    f"Email too short: {participant}"
-                )
+        suffix = "@mergington.edu"
+        bad_emails = {
+            participant
+            for data in activities.values()
+            for participant in data["participants"]
+            if not (participant.endswith(suffix) and len(participant) > len(suffix))
+        }
+        assert not bad_emails, f"Invalid participant emails: {bad_emails}"
 
 
 class TestActivityManipulation:
     """Test direct manipulation of activity data (simulating API operations)."""
     
-    def test_add_participant_to_activity(self, reset_activities):
+    def test_add_participant_to_activity(self):
         """Test adding a participant to an activity."""
         activity_name = "Chess Club"
         new_participant = "newtest@mergington.edu"
@@ -112,13 +104,13 @@ class TestActivityManipulation:
         initial_count = len(activities[activity_name]["participants"])
         
         # Add participant
-        activities[activity_name]["participants"].append(new_participant)
+        activities[activity_name]["participants"].add(new_participant)
         
         # Verify addition
         assert len(activities[activity_name]["participants"]) == initial_count + 1
         assert new_participant in activities[activity_name]["participants"]
     
-    def test_remove_participant_from_activity(self, reset_activities):
+    def test_remove_participant_from_activity(self):
         """Test removing a participant from an activity."""
         activity_name = "Chess Club"
         participant_to_remove = "michael@mergington.edu"
@@ -136,7 +128,7 @@ class TestActivityManipulation:
         assert len(activities[activity_name]["participants"]) == initial_count - 1
         assert participant_to_remove not in activities[activity_name]["participants"]
     
-    def test_activity_capacity_enforcement(self, reset_activities):
+    def test_activity_capacity_enforcement(self):
         """Test that we can simulate capacity enforcement."""
         # Create a test scenario with a nearly full activity
         activity_name = "Math Olympiad"  # Has max 16, currently has 2
@@ -144,7 +136,7 @@ class TestActivityManipulation:
         
         # Fill it up to capacity
         for i in range(activity["max_participants"] - len(activity["participants"])):
-            activity["participants"].append(f"student{i}@mergington.edu")
+            activity["participants"].add(f"student{i}@mergington.edu")
         
         # Verify it's now full
         assert len(activity["participants"]) == activity["max_participants"]
@@ -157,12 +149,12 @@ class TestActivityManipulation:
 class TestDataIntegrity:
     """Test data integrity and consistency."""
     
-    def test_activity_data_immutable_structure(self, reset_activities):
+    def test_activity_data_immutable_structure(self):
         """Test that the basic structure remains intact after operations."""
         original_keys = set(activities.keys())
         
         # Perform some operations
-        activities["Chess Club"]["participants"].append("temp@mergington.edu")
+        activities["Chess Club"]["participants"].add("temp@mergington.edu")
         activities["Programming Class"]["participants"].remove("emma@mergington.edu")
         
         # Structure should remain the same
@@ -174,18 +166,17 @@ class TestDataIntegrity:
             for field in required_fields:
                 assert field in activity_data
     
-    def test_reset_activities_fixture(self, reset_activities):
+    def test_reset_activities_fixture(self):
         """Test that the reset_activities fixture works correctly."""
         # Modify the activities
-        original_chess_participants = activities["Chess Club"]["participants"].copy()
-        activities["Chess Club"]["participants"].append("fixture_test@mergington.edu")
+        activities["Chess Club"]["participants"].add("fixture_test@mergington.edu")
         
         # Verify modification worked
         assert "fixture_test@mergington.edu" in activities["Chess Club"]["participants"]
         
         # The fixture should reset this after the test, which we can't test directly
         # but we can test that we have the expected initial state
-        expected_chess_participants = ["michael@mergington.edu", "daniel@mergington.edu"]
+        expected_chess_participants = {"michael@mergington.edu", "daniel@mergington.edu"}
         
         # Reset manually to test the concept
         activities["Chess Club"]["participants"] = expected_chess_participants.copy()